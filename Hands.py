@@ -3,22 +3,84 @@ import cv2  # OpenCV for image processing
 import numpy  # NumPy for mathematical operations
 import math  # Math for distance calculation
 
+try:
+    from numba import njit  # Optional: compiles the per-frame landmark postprocessing
+except ImportError:
+    def njit(*args, **kwargs):
+        """Fallback when Numba is not installed: leaves the function as plain Python."""
+        return lambda func: func
+
+# Landmark index ranges for each finger
+FINGER_SLICES = {
+    "thumb": slice(2, 5),
+    "index": slice(5, 9),
+    "middle": slice(9, 13),
+    "ring": slice(13, 17),
+    "pinky": slice(17, 21),
+}
+
+FINGER_ROWS = {name: row for row, name in enumerate(FINGER_SLICES)}  # Finger name to its position in Hand.TIP_IDX
+
+# Squared fingertip distances at which the scale steps up (15 to 200 px in five equal steps)
+THRESH_SQ = numpy.linspace(15, 200, 6)[1:] ** 2
+LABELS = ("ZERO", "ONE", "TWO", "THREE", "FOUR", "FIVE")
+
+@njit(cache=True)
+def _count_extended(pts, tip_idx, pip_idx, ref_idx):
+    """
+    Counts the extended fingers in the (21, 2) landmark array in one pass.
+
+    Returns:
+    - Number of extended fingers.
+    """
+    count = 0
+    for i in range(tip_idx.shape[0]):
+        # A finger is extended when its tip lies further from the reference point than its joint,
+        # which holds for either hand and any orientation
+        r = ref_idx[i]
+        tx = pts[tip_idx[i], 0] - pts[r, 0]
+        ty = pts[tip_idx[i], 1] - pts[r, 1]
+        px = pts[pip_idx[i], 0] - pts[r, 0]
+        py = pts[pip_idx[i], 1] - pts[r, 1]
+        if tx * tx + ty * ty > px * px + py * py:
+            count += 1
+
+    return count
+
 class Hand:
-    def __init__(self, mode=False, maxh=1, complex=1, det_conf=0.9, trac_conf=0.9):
+    TIP_IDX = numpy.array([4, 8, 12, 16, 20])  # Fingertip landmarks (thumb to pinky)
+    PIP_IDX = numpy.array([3, 6, 10, 14, 18])  # Joint each fingertip is compared against
+    REF_IDX = numpy.array([17, 0, 0, 0, 0])  # Reference point: pinky base for the thumb, wrist for the rest
+
+    def __init__(self, mode=False, maxh=1, complex=0, det_conf=0.5, trac_conf=0.5, infer_width=320, stride=1):
         """
         Initializes the Hand tracking class.
 
         Parameters:
         - mode: Whether to detect hands in a static image or video stream.
         - maxh: Maximum number of hands to detect.
-        - complex: Complexity level of the model (higher means more accuracy).
+        - complex: Complexity level of the model (0 is the faster lite model, 1 is more accurate).
         - det_conf: Minimum confidence for hand detection.
         - trac_conf: Minimum confidence for hand tracking.
+        - infer_width: Width wider frames are downscaled to before detection, keeping their aspect ratio (None for full resolution).
+        - stride: Run detection on every stride-th frame and reuse the last landmarks in between (1 runs every frame).
+          Only use more than 1 for consecutive video frames.
         """
         self.hands = mediapipe.solutions.hands.Hands(mode, maxh, complex, det_conf, trac_conf)
         self.pen = mediapipe.solutions.drawing_utils  # Utility for drawing hand landmarks
+        self.infer_width = infer_width  # Maximum frame width used for MediaPipe inference
+        self._stride = max(1, stride)  # Frames per MediaPipe run
+        self._frame_i = 0  # Number of frames passed to get_hand
         self.results = None  # Stores hand tracking results
-        self.line_dist = 0  # Distance between fingers
+        self._rgb_buf = None  # Reused RGB buffer for the inference frame
+        self.landmarks_px = None  # Cached (21, 2) pixel coordinates of the detected hand
+        self.extended_count = 0  # Number of extended fingers in the last frame
+        self.line_dist_sq = 0  # Squared distance between fingers
+
+    @property
+    def line_dist(self):
+        """Distance between fingers, computed from the squared distance on demand."""
+        return math.sqrt(self.line_dist_sq)
 
     def get_hand(self, img):
         """
@@ -30,8 +92,39 @@ class Hand:
         Returns:
         - img: Processed image with detected hands.
         """
-        _img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)  # Convert BGR to RGB for MediaPipe processing
-        self.results = self.hands.process(_img)  # Detect hands in the image
+        run_model = self._frame_i % self._stride == 0 or not self.results
+        self._frame_i += 1
+        if not run_model:
+            return img  # Hands move little between adjacent frames, reuse the cached landmarks
+
+        h, w = img.shape[:2]  # Landmarks are normalized, so they are scaled by the original image dimensions
+        infer_size = None
+        if self.infer_width and w > self.infer_width:
+            infer_size = (self.infer_width, max(1, round(h * self.infer_width / w)))  # Keep the aspect ratio
+
+        shape = (infer_size[1], infer_size[0]) + img.shape[2:] if infer_size else img.shape
+        if self._rgb_buf is None or self._rgb_buf.shape != shape:
+            self._rgb_buf = numpy.empty(shape, dtype=img.dtype)  # Allocate only when the inference frame size changes
+
+        if infer_size:
+            cv2.resize(img, infer_size, dst=self._rgb_buf, interpolation=cv2.INTER_AREA)  # Downscale a copy for faster inference
+            _img = cv2.cvtColor(self._rgb_buf, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)  # Convert to RGB in place
+        else:
+            _img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)  # Keep the caller's BGR frame for display
+        _img.flags.writeable = False  # Lets MediaPipe read the frame without copying it
+        try:
+            self.results = self.hands.process(_img)  # Detect hands in the image
+        finally:
+            _img.flags.writeable = True  # The buffer is written again on the next frame, even if processing failed
+        self.landmarks_px = None
+        self.extended_count = 0
+
+        if self.results.multi_hand_landmarks:
+            hand = self.results.multi_hand_landmarks[0]
+            lm = numpy.array([[p.x, p.y] for p in hand.landmark], dtype=numpy.float32)  # (21, 2) normalized coords
+            lm *= numpy.array([w, h], dtype=numpy.float32)  # Convert relative coords to absolute in place
+            self.landmarks_px = lm.astype(numpy.int32)
+            self.extended_count = int(_count_extended(self.landmarks_px, self.TIP_IDX, self.PIP_IDX, self.REF_IDX))
 
         # Uncomment to draw landmarks on detected hands
         # if self.results.multi_hand_landmarks:
@@ -49,42 +142,22 @@ class Hand:
         - finger: The name of the finger to track (default is all fingers).
 
         Returns:
-        - List of coordinates for the given finger.
+        - (n, 2) int32 array of pixel coordinates for the given finger, or None if no hand is detected.
+          The array is a view of the per-frame landmark cache, so compare against None rather than
+          testing its truth value, and copy it if it must outlive the next get_hand call.
+        - With no finger name, a list of these arrays (or Nones), one per finger from thumb to pinky.
         """
-        positions = []
-
-        # Assigning landmark indexes for each finger
-        if finger == "thumb":
-            points = [2, 3, 4]
-        elif finger == "index":
-            points = [5, 6, 7, 8]
-        elif finger == "middle":
-            points = [9, 10, 11, 12]
-        elif finger == "ring":
-            points = [13, 14, 15, 16]
-        elif finger == "pinky":
-            points = [17, 18, 19, 20]
-        else:
+        if finger not in FINGER_SLICES:
             # Return positions of all fingers if no specific finger is mentioned
-            return [
-                self.get_finger(img, "thumb"),
-                self.get_finger(img, "index"),
-                self.get_finger(img, "middle"),
-                self.get_finger(img, "ring"),
-                self.get_finger(img, "pinky")
-            ]
+            return [self.get_finger(img, name) for name in FINGER_SLICES]
 
         if not self.results:
             self.get_hand(img)  # Process the image to detect hands
 
-        if self.results.multi_hand_landmarks:
-            h, w = img.shape[:2]  # Get image dimensions
-            for i in self.results.multi_hand_landmarks:
-                for point, landmark in enumerate(i.landmark):
-                    if point in points:
-                        positions.append((int(landmark.x * w), int(landmark.y * h)))  # Convert relative coords to absolute
+        if self.landmarks_px is None:
+            return None  # No hand detected
 
-        return positions if positions else None  # Return positions or None if no finger is detected
+        return self.landmarks_px[FINGER_SLICES[finger]]  # Slice the cached landmarks for the finger
 
     def finger_count(self, img):
         """
@@ -96,25 +169,10 @@ class Hand:
         Returns:
         - String representing the number of fingers extended.
         """
-        mapping = {0: "ZERO", 1: "ONE", 2: "TWO", 3: "THREE", 4: "FOUR", 5: "FIVE"}
-        count = 0
-
-        points = self.get_finger(img)  # Get all fingers' positions
-
-        if points:
-            # Checking if each finger is extended by comparing fingertip position with previous joint
-            if points[1][-1][0] > points[1][-2][0]:  # Index finger
-                count += 1
-            if points[2][-1][0] > points[2][-2][0]:  # Middle finger
-                count += 1
-            if points[3][-1][0] > points[3][-2][0]:  # Ring finger
-                count += 1
-            if points[4][-1][0] > points[4][-2][0]:  # Pinky finger
-                count += 1
-            if points[0][-1][0] > points[0][-2][0]:  # Thumb
-                count += 1
-
-        return mapping[count]  # Return the finger count as a string
+        if not self.results:
+            self.get_hand(img)  # Process the image to detect hands
+
+        return LABELS[self.extended_count]  # Return the finger count as a string
 
     def draw_line(self, img, finger1="thumb", finger2="index", draw=False):
         """
@@ -132,52 +190,74 @@ class Hand:
         if not self.results:
             self.get_hand(img)  # Process image if hand tracking results are not available
 
-        if self.results.multi_hand_landmarks:
-            for i in self.results.multi_hand_landmarks:
-                fing1_pos = self.get_finger(img, finger1)[-1] if self.get_finger(img, finger1) else None
-                fing2_pos = self.get_finger(img, finger2)[-1] if self.get_finger(img, finger2) else None
-
-                if fing1_pos and fing2_pos:
-                    self.line_dist = math.hypot(fing1_pos[0] - fing2_pos[0], fing1_pos[1] - fing2_pos[1])  # Calculate Euclidean distance
+        if self.landmarks_px is not None:
+            fing1_pos = tuple(self.landmarks_px[self.TIP_IDX[FINGER_ROWS[finger1]]].tolist())  # Fingertip of the first finger
+            fing2_pos = tuple(self.landmarks_px[self.TIP_IDX[FINGER_ROWS[finger2]]].tolist())  # Fingertip of the second finger
+            dx, dy = fing1_pos[0] - fing2_pos[0], fing1_pos[1] - fing2_pos[1]
+            self.line_dist_sq = dx * dx + dy * dy  # Squared Euclidean distance, no sqrt needed for scaling
 
-                    if draw:
-                        cv2.line(img, fing1_pos, fing2_pos, (0, 255, 0), 5)  # Draw a green line
-                        return img
+            if draw:
+                cv2.line(img, fing1_pos, fing2_pos, (0, 255, 0), 5)  # Draw a green line
+                return img
 
-                    return [
-                        fing1_pos,
-                        ((fing1_pos[0] + fing2_pos[0]) // 2, (fing1_pos[1] + fing2_pos[1]) // 2),
-                        fing2_pos
-                    ], self.line_dist  # Return finger positions and distance
+            return [
+                fing1_pos,
+                ((fing1_pos[0] + fing2_pos[0]) // 2, (fing1_pos[1] + fing2_pos[1]) // 2),
+                fing2_pos
+            ], self.line_dist  # Return finger positions and distance
 
         return None, None  # Return None if no fingers are detected
 
-def map_distance_to_scale(distance, min_distance=15, max_distance=200):
+def map_distance_to_scale(distance_sq, thresholds_sq=THRESH_SQ):
     """
-    Maps a measured distance to a scale of 0 to 5.
+    Maps a squared distance between fingers to a scale of 0 to 5.
 
     Parameters:
-    - distance: The measured distance between fingers.
-    - min_distance: Minimum distance for scaling.
-    - max_distance: Maximum distance for scaling.
+    - distance_sq: The squared distance between fingers (see Hand.line_dist_sq).
+    - thresholds_sq: Ascending squared distances at which the scale steps up.
 
     Returns:
-    - String representation of the mapped value.
+    - Integer bucket from 0 to 5 (LABELS gives its string form).
+    """
+    return min(5, int(numpy.searchsorted(thresholds_sq, distance_sq, side="right")))  # Bucket the value
+
+def frames_to_grab(camera, drain=False):
     """
-    mapping = {0: "ZERO", 1: "ONE", 2: "TWO", 3: "THREE", 4: "FOUR", 5: "FIVE"}
-    return mapping[int(numpy.interp(distance, [min_distance, max_distance], [0, 5]))]  # Scale and map the value
+    Asks the camera driver to buffer a single frame and works out how many frames to grab per read.
+
+    Parameters:
+    - camera: An opened cv2.VideoCapture.
+    - drain: Whether to grab the driver's whole reported buffer when it can't be set to 1. Only useful
+      for loops that read slower than the camera; a reader that grabs continuously keeps the buffer
+      empty, and extra grabs would just block on new frames.
+
+    Returns:
+    - Number of grab() calls per read (always at least 1).
+    """
+    if camera.set(cv2.CAP_PROP_BUFFERSIZE, 1) or not drain:  # Keep only the newest frame in the driver buffer
+        return 1
+    return max(1, int(camera.get(cv2.CAP_PROP_BUFFERSIZE)))  # Unsupported backends report 0 or -1
+
+# Compile (or load the cached build of) the finger counting kernel at import rather than on the first frame
+_count_extended(numpy.zeros((21, 2), dtype=numpy.int32), Hand.TIP_IDX, Hand.PIP_IDX, Hand.REF_IDX)
 
 if __name__ == "__main__":
     camera = cv2.VideoCapture(0)  # Open camera feed
+    grabs = frames_to_grab(camera, drain=True)  # This loop is slower than the camera, drain stale frames
     detector = Hand()  # Initialize hand tracking
 
     while True:
-        _, img = camera.read()  # Capture frame from camera
+        for _ in range(grabs):
+            camera.grab()  # Drain buffered frames so only the freshest one is decoded
+        ret, img = camera.retrieve()  # Decode the latest grabbed frame
+        if not ret:  # Check if frame was read successfully
+            print("Error reading frame. Exiting.")
+            break
         detector.get_hand(img)  # Process the frame for hand tracking
         detector.draw_line(img, draw=True)  # Draw a line between thumb and index finger
 
         # Print the mapped finger distance
-        print(map_distance_to_scale(detector.line_dist))
+        print(LABELS[map_distance_to_scale(detector.line_dist_sq)])
 
         cv2.imshow("Camera", img)  # Display the camera feed
         cv2.waitKey(1)  # Wait for a key press (loop continues indefinitely)
@@ -12,7 +12,7 @@ Dependencies:
 
 Usage:
     1. Ensure your camera is connected.
-    2. Run the script.
+    2. Run the script (add --show to display the camera feed, press 'q' in the window to quit).
     3. Select the correct COM port from the list displayed.
     4. The script will continuously send scaled distance data to the serial port.
 
@@ -20,16 +20,89 @@ Author: Arnav Bansal/Helixo613
 Date: 15-06-2024
 """
 
-from Hands import Hand, map_distance_to_scale  # Import custom hand detection and scaling functions
+from Hands import Hand, map_distance_to_scale, frames_to_grab, LABELS  # Import custom hand detection and scaling functions
 import cv2  # Import OpenCV for image processing
 import serial  # Import PySerial for serial communication
 import serial.tools.list_ports as sp  # Import tools to list serial ports
-import time  # Import time for delays
+import queue  # Import queue for passing frames between threads
+import threading  # Import threading to run capture and output alongside detection
+import argparse  # Import argparse for command-line options
 
-def runner():
+PAYLOADS = [(label + "\n").encode('utf-8') for label in LABELS]  # Serial message for each scale bucket
+SHOW_EVERY = 3  # Display one in every SHOW_EVERY frames when the camera feed is shown
+
+def put_frame(q, item, stop):
+    """
+    Puts an item on a bounded queue, blocking until there is room or the pipeline stops.
+    """
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+
+def read_frames(camera, grabs, read_q, stop):
+    """
+    Reader thread: grabs the freshest camera frame and leaves it in a single-slot
+    queue for hand detection, replacing any frame that has not been picked up yet.
+    """
+    while not stop.is_set():
+        for _ in range(grabs):
+            camera.grab()  # Drain buffered frames so only the freshest one is decoded
+        ret, frame = camera.retrieve()  # Decode the latest grabbed frame
+        if not ret:  # Check if frame was read successfully
+            print("Error reading frame. Exiting.")
+            stop.set()
+            break
+        try:
+            read_q.get_nowait()  # Drop the stale frame detection has not taken yet
+        except queue.Empty:
+            pass
+        read_q.put_nowait(frame)  # This is the only producer, so the slot is free now
+
+def send_payloads(serial_, serial_q, stop):
+    """
+    Serial thread: writes queued scale buckets to the serial port so a slow or
+    stalled device never blocks frame processing.
+    """
+    while not stop.is_set():
+        try:
+            bucket = serial_q.get(timeout=0.1)  # Wait for the next changed bucket
+        except queue.Empty:
+            continue
+
+        try:
+            serial_.write(PAYLOADS[bucket])  # Send data to serial port
+            print(f"Sent: {LABELS[bucket]}")  # Print sent data
+        except serial.SerialException as e:  # Handle serial port writing errors
+            print(f"Serial port error: {e}")
+            stop.set()
+            break  # Exit loop if error occurs
+
+def show_frames(show_q, stop):
+    """
+    Display thread: shows the processed frames selected by the detection loop.
+    """
+    while not stop.is_set():
+        try:
+            frame = show_q.get(timeout=0.1)  # Wait for the next frame to display
+        except queue.Empty:
+            continue
+
+        cv2.imshow("Hand Gesture Control", frame)  # Display the frame
+        if cv2.waitKey(1) & 0xFF == ord('q'):  # Check for 'q' key press to exit
+            stop.set()
+            break  # Exit loop if 'q' is pressed
+
+def runner(show=False, high_accuracy=False):
     """
     Captures video, detects hand gestures, calculates distance, scales it,
     and sends the data to the serial port.
+
+    Parameters:
+    - show: Whether to display the camera feed with the fingertip line drawn.
+    - high_accuracy: Whether to use the full hand model instead of the faster lite model.
     """
     # --- Serial Port Selection ---
     ports = sp.comports()  # Get a list of available serial ports
@@ -62,39 +135,57 @@ def runner():
 
     # --- Camera and Hand Detection Initialization ---
     camera = cv2.VideoCapture(0)  # Initialize camera (0 for default camera)
-    detector = Hand(trac_conf=0.9, det_conf=0.9)  # Initialize hand detection object
-    last_sent_data = ""  # Initialize variable to store last sent data
-
-    # --- Main Loop: Capture, Process, and Send Data ---
+    grabs = frames_to_grab(camera)  # The reader thread grabs continuously, so one grab per read
+    detector = Hand(complex=1 if high_accuracy else 0, stride=2)  # Initialize hand detection, detecting every other frame
+
+    last_bucket = -1  # Initialize variable to store last queued bucket
+    i = 0  # Number of processed frames
+
+    # --- Pipeline: reader thread -> hand detection (this thread) -> serial and display threads ---
+    read_q = queue.Queue(maxsize=1)  # Latest captured frame waiting for hand detection
+    serial_q = queue.Queue(maxsize=8)  # Changed buckets waiting to be sent
+    show_q = queue.Queue(maxsize=2)  # Processed frames waiting for display
+    stop = threading.Event()  # Signals every stage to shut down
+    threads = [
+        threading.Thread(target=read_frames, args=(camera, grabs, read_q, stop), daemon=True),
+        threading.Thread(target=send_payloads, args=(serial_, serial_q, stop), daemon=True),
+    ]
+    if show:
+        threads.append(threading.Thread(target=show_frames, args=(show_q, stop), daemon=True))
+    for thread in threads:
+        thread.start()
+
+    # --- Main Loop: Process frames (MediaPipe stays on this thread) ---
     try:
-        while True:
-            ret, frame = camera.read()  # Read a frame from the camera
-            if not ret:  # Check if frame was read successfully
-                print("Error reading frame. Exiting.")
-                break  # Exit loop if frame error
+        while not stop.is_set():
+            try:
+                frame = read_q.get(timeout=0.1)  # Wait for the next captured frame
+            except queue.Empty:
+                continue
+
+            i += 1
+            display = show and i % SHOW_EVERY == 0  # Only every SHOW_EVERY-th frame is drawn and displayed
 
             detector.get_hand(frame)  # Detect hands in the frame
-            detector.draw_line(frame, draw=True)  # Draw line between fingertips
-            scaled_distance = str(map_distance_to_scale(detector.line_dist)) + "\n"  # Scale distance and add newline
+            detector.draw_line(frame, draw=display)  # Measure (and draw, if displayed) the line between fingertips
+            bucket = map_distance_to_scale(detector.line_dist_sq)  # Scale distance to a 0-5 bucket
 
-            if scaled_distance != last_sent_data:  # Check if data has changed
+            if bucket != last_bucket:  # Check if data has changed
                 try:
-                    serial_.write(scaled_distance.encode('utf-8'))  # Send data to serial port
-                    print(f"Sent: {scaled_distance.strip()}")  # Print sent data
-                    last_sent_data = scaled_distance  # Update last sent data
-                except serial.SerialException as e:  # Handle serial port writing errors
-                    print(f"Serial port error: {e}")
-                    break  # Exit loop if error occurs
-
-            cv2.imshow("Hand Gesture Control", frame)  # Display the frame
-            if cv2.waitKey(1) & 0xFF == ord('q'):  # Check for 'q' key press to exit
-                break  # Exit loop if 'q' is pressed
+                    serial_q.put_nowait(bucket)  # Hand off to the serial thread without blocking
+                    last_bucket = bucket  # Update last queued bucket
+                except queue.Full:
+                    pass  # Serial port is behind, retry on a later frame rather than stall capture
 
-            time.sleep(1 / 24)  # Control frame rate (approximately 24 FPS)
+            if display:
+                put_frame(show_q, frame, stop)  # Hand off to the display thread
 
     except KeyboardInterrupt:  # Handle keyboard interrupt (Ctrl+C)
         print("\nScript interrupted by user.")
     finally:  # Cleanup resources
+        stop.set()  # Stop the reader, serial and display threads
+        for thread in threads:
+            thread.join(timeout=1)  # Don't hang on a serial write to a stalled device
         camera.release()  # Release camera resources
         cv2.destroyAllWindows()  # Close OpenCV windows
         if serial_.is_open:  # Close serial port if it's open
@@ -102,4 +193,8 @@ def runner():
             print("Serial port closed.")
 
 if __name__ == "__main__":
-    runner()  # Call the runner function when script is executed
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Hand gesture to serial communication")
+    parser.add_argument("--show", action="store_true", help="display the camera feed")
+    parser.add_argument("--high-accuracy", action="store_true", help="use the full hand model instead of the lite one")
+    args = parser.parse_args()
+    runner(show=args.show, high_accuracy=args.high_accuracy)  # Call the runner function when script is executed
\ No newline at end of file